@@ -1,10 +1,22 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
-from models import db, Player, Match, Prediction, ManualResult
+import hashlib
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, make_response, abort
+from models import db, Player, Match, Prediction, ManualResult, MATCH_RESULT_SQL, MATCH_STATUSES, PICKS
+from sqlalchemy import distinct, func, literal_column, or_, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from email.utils import format_datetime
+import time
+from itertools import groupby
 from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
+import threading
+import click
 
 load_dotenv()
 
@@ -25,6 +37,15 @@ app.config['SECRET_KEY'] = SECRET_KEY
 # Use psycopg driver for Postgres + Python 3.13 compatibility
 SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL").replace("postgres://", "postgresql+psycopg://")
 app.config['SQLALCHEMY_DATABASE_URI'] = SQLALCHEMY_DATABASE_URI
+# The pool is per process: with N gunicorn workers (plus the scheduler process) Postgres
+# can see up to N * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections, so size these to fit
+# the plan's connection limit. Pre-ping and recycle drop connections the host closed.
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': int(os.getenv("DB_POOL_SIZE", "5")),
+    'max_overflow': int(os.getenv("DB_MAX_OVERFLOW", "5")),
+    'pool_pre_ping': True,
+    'pool_recycle': 300,
+}
 db.init_app(app)
 
 # Configure competition: Premier League (use code 'PL' in football-data)
@@ -34,148 +55,380 @@ HEADERS = {
     "X-Auth-Token": FOOTBALL_DATA_API_KEY
 }
 
+# One keep-alive session for all Football-Data calls so repeated refreshes reuse the
+# TLS connection; transient errors and rate limiting (429) are retried with backoff.
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Matchdays around the current one are polled from the API by a single
+# `flask --app app run-scheduler` process; request handlers only read the DB.
+MATCHDAYS = range(1, 39)  # 1..38 inclusive
+REFRESH_INTERVAL_MINUTES = 10
+REFRESH_WINDOW = 2  # matchdays either side of the current one
+
+# matchday -> time.monotonic() deadline until which the API fetch is skipped
+MATCHDAY_CACHE_TTL = 300  # seconds
+_MATCHDAY_CACHE = {}
+
+# gameweeks offered on the index page; GW1-3 results are entered by the admin
+GW_OPTIONS = tuple(range(4, 39))  # 4..38 inclusive
+
+# (id, name) of every player, reloaded at most every PLAYERS_CACHE_TTL seconds;
+# players are only added by init-db, which may run in another process
+PLAYERS_CACHE_TTL = 60  # seconds
+_PLAYERS_CACHE = {"expires": 0.0, "players": ()}
+
 # Helper functions
-def fetch_matches_for_matchday(matchday:int):
-    """Fetch matches from Football-Data API for the Premier League matchday."""
+def fetch_matches_for_matchday(matchday:int, modified_since=None):
+    """Fetch matches from Football-Data API for the Premier League matchday.
+    Returns None if the API reports nothing changed since `modified_since` (naive UTC)."""
     url = f"https://api.football-data.org/v4/competitions/{COMPETITION_CODE}/matches?matchday={matchday}"
-    resp = requests.get(url, headers=HEADERS, timeout=15)
+    headers = {}
+    if modified_since:
+        headers["If-Modified-Since"] = format_datetime(modified_since.replace(tzinfo=timezone.utc), usegmt=True)
+    resp = _SESSION.get(url, headers=headers, timeout=15)
+    if resp.status_code == 304:
+        return None
     resp.raise_for_status()
     return resp.json().get('matches', [])
 
+def fetch_matches_for_season(season:int):
+    """Fetch every Premier League match of a season (e.g. 2024 for 2024/25) in one call."""
+    url = f"https://api.football-data.org/v4/competitions/{COMPETITION_CODE}/matches?season={season}"
+    resp = _SESSION.get(url, timeout=15)
+    resp.raise_for_status()
+    return resp.json().get('matches', [])
+
+def fetch_current_matchday():
+    url = f"https://api.football-data.org/v4/competitions/{COMPETITION_CODE}"
+    resp = _SESSION.get(url, timeout=15)
+    resp.raise_for_status()
+    return (resp.json().get('currentSeason') or {}).get('currentMatchday')
+
+def match_values_from_api(m, matchday:int, season=None):
+    """Map one Football-Data match to a row of the matches table."""
+    home_score = None
+    away_score = None
+    if m.get('score') and m['score'].get('fullTime'):
+        ft = m['score']['fullTime']
+        home_score = ft.get('home')
+        away_score = ft.get('away')
+    return {
+        "api_match_id": m['id'],
+        "competition": COMPETITION_CODE,
+        "season": season,
+        "matchday": matchday,
+        "utc_date": datetime.fromisoformat(m['utcDate'].replace("Z","+00:00")),
+        "home_team": m['homeTeam']['name'],
+        "away_team": m['awayTeam']['name'],
+        "status": m.get('status', 'SCHEDULED'),
+        "home_score": home_score,
+        "away_score": away_score
+    }
+
 def upsert_matches_from_api(matchday:int):
-    matches = fetch_matches_for_matchday(matchday)
-    added = 0
-    for m in matches:
-        api_id = m['id']
-        utc_date = datetime.fromisoformat(m['utcDate'].replace("Z","+00:00"))
-        home = m['homeTeam']['name']
-        away = m['awayTeam']['name']
-        status = m.get('status', 'SCHEDULED')
-        home_score = None
-        away_score = None
-        if m.get('score') and m['score'].get('fullTime'):
-            ft = m['score']['fullTime']
-            home_score = ft.get('home')
-            away_score = ft.get('away')
-
-        existing = Match.query.filter_by(api_match_id=api_id).first()
-        if existing:
-            # update
-            existing.utc_date = utc_date
-            existing.status = status
-            existing.home_team = home
-            existing.away_team = away
-            existing.home_score = home_score
-            existing.away_score = away_score
-        else:
-            new = Match(
-                api_match_id=api_id,
-                competition=COMPETITION_CODE,
-                season=None,
-                matchday=matchday,
-                utc_date=utc_date,
-                home_team=home,
-                away_team=away,
-                status=status,
-                home_score=home_score,
-                away_score=away_score
-            )
-            db.session.add(new)
-            added += 1
+    # read on a short-lived connection so the caller's session is untouched and no
+    # pooled connection is held during the HTTP call
+    with db.engine.connect() as conn:
+        last_update = conn.execute(
+            select(func.max(Match.updated_at)).where(Match.matchday == matchday)
+        ).scalar()
+    matches = fetch_matches_for_matchday(matchday, modified_since=last_update)
+    if not matches:
+        return 0
+    values = [match_values_from_api(m, matchday) for m in matches]
+
+    # one INSERT ... ON CONFLICT DO UPDATE for the whole matchday
+    stmt = pg_insert(Match.__table__).values(values)
+    columns = ('utc_date','status','home_team','away_team','home_score','away_score')
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['api_match_id'],
+        # Core upserts skip the ORM onupdate, so bump updated_at explicitly
+        set_={**{c: stmt.excluded[c] for c in columns}, 'updated_at': stmt.excluded.updated_at},
+        # leave unchanged rows alone so updated_at (and page ETags) stay stable
+        where=or_(*[Match.__table__.c[c].is_distinct_from(stmt.excluded[c]) for c in columns])
+    )
+    # RETURNING only yields inserted or changed rows; xmax = 0 only for freshly inserted ones
+    changed = db.session.execute(stmt.returning(literal_column("xmax = 0"), Match.__table__.c.result)).all()
     db.session.commit()
-    return added
+    # a new or corrected score changes the standings
+    if any(result is not None for _, result in changed):
+        refresh_player_totals()
+    return sum(1 for was_inserted, _ in changed if was_inserted)
 
-def result_of_match(match:Match):
-    """Return 'HOME','AWAY','DRAW' if finished and scores known, else None."""
-    if match.home_score is None or match.away_score is None:
-        return None
-    if match.home_score > match.away_score:
-        return 'HOME'
-    if match.away_score > match.home_score:
-        return 'AWAY'
-    return 'DRAW'
-
-def points_for_prediction(pred_pick, match:Match):
-    res = result_of_match(match)
-    if res is None:
+def picks_close_before():
+    """Picks are accepted for matches kicking off after this (naive UTC) time."""
+    return datetime.utcnow() + timedelta(minutes=5)
+
+def matchday_finished(matchday:int):
+    # short-lived connection, like upsert_matches_from_api, so the session isn't left
+    # idle in transaction through the next matchday's HTTP call
+    with db.engine.connect() as conn:
+        statuses = conn.execute(select(Match.status).where(Match.matchday == matchday)).scalars().all()
+    return bool(statuses) and all(status == "FINISHED" for status in statuses)
+
+def upsert_matches_cached(matchday:int, ttl:int=MATCHDAY_CACHE_TTL):
+    """Like upsert_matches_from_api, but skip the API call if this matchday was
+    refreshed within `ttl` seconds. Fully finished matchdays are never refetched."""
+    now = time.monotonic()
+    expires = _MATCHDAY_CACHE.get(matchday)
+    if expires and expires > now:
         return 0
-    return 1 if pred_pick == res else 0
+    added = upsert_matches_from_api(matchday)
+    _MATCHDAY_CACHE[matchday] = float("inf") if matchday_finished(matchday) else now + ttl
+    return added
+
+WEEKLY_RESULTS_SQL = """
+SELECT pl.id AS player_id, pl.name, m.id AS match_id, pr.pick,
+       CASE WHEN m.result = pr.pick::text THEN 1 ELSE 0 END AS points
+FROM players pl
+CROSS JOIN matches m
+LEFT JOIN predictions pr ON pr.player_id = pl.id AND pr.match_id = m.id
+WHERE m.id = ANY(:match_ids)
+ORDER BY pl.id, m.utc_date, m.id
+"""
+
+def conditional_page(tag, render):
+    """Answer 304 if the browser already has `tag`, else render() with ETag headers."""
+    if request.if_none_match.contains(tag):
+        response = make_response("", 304)
+    else:
+        response = make_response(render())
+    response.set_etag(tag)
+    response.headers["Cache-Control"] = "private, max-age=30"
+    return response
+
+def etag_for(*parts):
+    return hashlib.md5(":".join(str(p) for p in parts).encode()).hexdigest()
+
+def create_enum_sql(name, values):
+    """CREATE TYPE ... AS ENUM that is a no-op if the type already exists."""
+    labels = ", ".join(f"'{v}'" for v in values)
+    return f"DO $$ BEGIN CREATE TYPE {name} AS ENUM ({labels}); EXCEPTION WHEN duplicate_object THEN NULL; END $$"
+
+# db.create_all() only creates missing tables, so schema additions made after the
+# first deploy are applied here. Every statement must be safe to re-run.
+SCHEMA_UPGRADES = [
+    "CREATE INDEX IF NOT EXISTS ix_matches_matchday_date ON matches (matchday, utc_date)",
+    "CREATE INDEX IF NOT EXISTS ix_predictions_match_id ON predictions (match_id)",
+    f"ALTER TABLE matches ADD COLUMN IF NOT EXISTS result VARCHAR(4) GENERATED ALWAYS AS ({MATCH_RESULT_SQL}) STORED",
+    "ALTER TABLE matches ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP",
+    "ALTER TABLE predictions ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP",
+    # rows from before updated_at existed; unchanged rows are never rewritten by the upserts
+    "UPDATE matches SET updated_at = timezone('utc', now()) WHERE updated_at IS NULL",
+    "UPDATE predictions SET updated_at = COALESCE(created_at, timezone('utc', now())) WHERE updated_at IS NULL",
+    create_enum_sql("pick_enum", PICKS),
+    "ALTER TABLE predictions ALTER COLUMN pick TYPE pick_enum USING pick::pick_enum",
+    create_enum_sql("match_status_enum", MATCH_STATUSES),
+    "ALTER TABLE matches ALTER COLUMN status TYPE match_status_enum USING status::match_status_enum",
+]
+
+# The init-db steps below leave committing to init_db.
+def upgrade_schema():
+    for statement in SCHEMA_UPGRADES:
+        db.session.execute(text(statement))
+
+# Season standings: one row per player with points from every finished match.
+PLAYER_TOTALS_VIEW_SQL = """
+CREATE MATERIALIZED VIEW mv_player_totals AS
+SELECT p.id AS player_id,
+       p.name,
+       COUNT(m.id) AS total
+FROM players p
+LEFT JOIN predictions pr ON pr.player_id = p.id
+LEFT JOIN matches m ON m.id = pr.match_id AND m.result = pr.pick::text
+GROUP BY p.id, p.name
+"""
+
+def drop_player_totals_view():
+    # the view pins the types of the columns it reads, so drop it before schema upgrades
+    db.session.execute(text("DROP MATERIALIZED VIEW IF EXISTS mv_player_totals"))
+
+def create_player_totals_view():
+    # rebuilt on every init-db so changes to the definition take effect
+    db.session.execute(text(PLAYER_TOTALS_VIEW_SQL))
+    # unique index is required for REFRESH ... CONCURRENTLY
+    db.session.execute(text("CREATE UNIQUE INDEX ix_mv_player_totals_player_id ON mv_player_totals (player_id)"))
+
+def refresh_player_totals():
+    """Recompute standings. Call whenever a match result is set; picks are locked
+    before kickoff so prediction edits never change the totals."""
+    db.session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_player_totals"))
+    db.session.commit()
+
+def cached_players():
+    now = time.monotonic()
+    if _PLAYERS_CACHE["expires"] <= now:
+        # plain dicts rather than ORM objects, which would be detached after this request
+        _PLAYERS_CACHE["players"] = tuple({"id": p.id, "name": p.name} for p in Player.query.order_by(Player.id).all())
+        _PLAYERS_CACHE["expires"] = now + PLAYERS_CACHE_TTL
+    return _PLAYERS_CACHE["players"]
 
 def ensure_six_players():
     # Create placeholder players if not exist (the user can rename later by editing DB)
     default_names = ["Biniam A","Biniam G","Biniam E","Abel","Siem","Kubrom"]
-    for name in default_names:
-        if not Player.query.filter_by(name=name).first():
-            db.session.add(Player(name=name))
-    db.session.commit()
+    stmt = pg_insert(Player.__table__).values([{"name": name} for name in default_names])
+    db.session.execute(stmt.on_conflict_do_nothing(index_elements=['name']))
+    _PLAYERS_CACHE["expires"] = 0.0
 
-@app.before_first_request
-def init():
+# Run once per deploy (e.g. `flask --app app init-db`) rather than on the first request
+@app.cli.command("init-db")
+def init_db():
+    """Create tables, apply schema upgrades and seed the default players."""
     db.create_all()
+    # one transaction (Postgres DDL is transactional): /totals keeps reading the old
+    # view until commit, and a failing upgrade rolls back without losing the view
+    drop_player_totals_view()
+    upgrade_schema()
     ensure_six_players()
+    create_player_totals_view()
+    db.session.commit()
+    click.echo("Database initialised.")
+
+SEASON_IMPORT_COLUMNS = ('api_match_id','competition','season','matchday','utc_date',
+                         'home_team','away_team','status','home_score','away_score')
+
+@app.cli.command("seed-season")
+@click.option("--season", type=int, required=True, help="Season start year, e.g. 2024 for 2024/25.")
+def seed_season(season):
+    """Load a whole season's fixtures with COPY instead of 38 matchday upserts."""
+    rows = [match_values_from_api(m, m['matchday'], season) for m in fetch_matches_for_season(season)]
+    columns = ", ".join(SEASON_IMPORT_COLUMNS)
+    updates = ('season','utc_date','status','home_team','away_team','home_score','away_score')
+    db.session.execute(text("""
+        CREATE TEMP TABLE matches_import (
+            api_match_id INTEGER, competition VARCHAR(10), season INTEGER, matchday INTEGER,
+            utc_date TIMESTAMP, home_team VARCHAR(120), away_team VARCHAR(120), status match_status_enum,
+            home_score INTEGER, away_score INTEGER
+        ) ON COMMIT DROP
+    """))
+    # COPY into the temp table on the session's own psycopg connection, then merge
+    cursor = db.session.connection().connection.cursor()
+    with cursor.copy(f"COPY matches_import ({columns}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row([row[c] for c in SEASON_IMPORT_COLUMNS])
+    set_clause = ", ".join(f"{c} = EXCLUDED.{c}" for c in updates + ('updated_at',))
+    current = ", ".join(f"matches.{c}" for c in updates)
+    incoming = ", ".join(f"EXCLUDED.{c}" for c in updates)
+    db.session.execute(text(f"""
+        INSERT INTO matches ({columns}, updated_at)
+        SELECT {columns}, timezone('utc', now()) FROM matches_import
+        ON CONFLICT (api_match_id) DO UPDATE SET {set_clause}
+        WHERE ({current}) IS DISTINCT FROM ({incoming})
+    """))
+    db.session.commit()
+    refresh_player_totals()
+    click.echo(f"Loaded {len(rows)} matches for season {season}.")
+
+# web processes only use this for one-off refreshes queued by enqueue_matchday_refresh
+scheduler = BackgroundScheduler(daemon=True)
+_scheduler_lock = threading.Lock()
+
+def refresh_current_matchdays():
+    with app.app_context():
+        try:
+            current = fetch_current_matchday()
+        except Exception:
+            app.logger.exception("Looking up the current matchday failed")
+            return
+        if current is None:
+            # between seasons the API reports no current matchday
+            return
+        for matchday in range(max(1, current - REFRESH_WINDOW), min(MATCHDAYS[-1], current + REFRESH_WINDOW) + 1):
+            try:
+                upsert_matches_cached(matchday)
+            except Exception:
+                app.logger.exception("Refreshing matchday %s failed", matchday)
+
+def refresh_matchday(matchday:int):
+    with app.app_context():
+        # explicit refresh: drop any cached entry so the API is always hit
+        _MATCHDAY_CACHE.pop(matchday, None)
+        upsert_matches_cached(matchday)
+
+def enqueue_matchday_refresh(matchday:int):
+    """Run refresh_matchday in this process's background scheduler as soon as possible."""
+    if not scheduler.running:
+        with _scheduler_lock:
+            if not scheduler.running:
+                scheduler.start()
+    scheduler.add_job(refresh_matchday, args=[matchday], id=f"refresh_matchday_{matchday}", replace_existing=True)
+
+# Run as its own process next to the web workers (e.g. a Procfile `worker:` entry), so
+# exactly one poller exists however many gunicorn workers there are.
+@app.cli.command("run-scheduler")
+def run_scheduler():
+    """Refresh matchdays around the current one every REFRESH_INTERVAL_MINUTES until stopped."""
+    poller = BlockingScheduler()
+    poller.add_job(refresh_current_matchdays, "interval", minutes=REFRESH_INTERVAL_MINUTES,
+                   id="refresh_current_matchdays", next_run_time=datetime.now())
+    click.echo(f"Polling Football-Data every {REFRESH_INTERVAL_MINUTES} minutes.")
+    poller.start()
 
 @app.route("/")
 def index():
     # Show dropdown with player names and gameweek options (GW4..GW38)
-    players = Player.query.all()
-    # default GW start from 4 as requested
-    gw_options = list(range(4, 39))  # 4..38 inclusive
-    return render_template("index.html", players=players, gw_options=gw_options)
+    return render_template("index.html", players=cached_players(), gw_options=GW_OPTIONS)
 
-@app.route("/fetch_matchday/<int:matchday>")
+@app.route("/fetch_matchday/<int:matchday>", methods=["POST"])
 def fetch_matchday(matchday):
-    try:
-        added = upsert_matches_from_api(matchday)
-        return jsonify({"status":"ok","added":added})
-    except Exception as e:
-        return jsonify({"status":"error","message":str(e)}), 500
+    if matchday not in MATCHDAYS:
+        return jsonify({"status":"error","message":f"matchday must be between 1 and {MATCHDAYS[-1]}"}), 400
+    enqueue_matchday_refresh(matchday)
+    return jsonify({"status":"queued","matchday":matchday}), 202
 
 @app.route("/make_prediction", methods=["GET","POST"])
 def make_prediction():
     player_id = request.args.get("player_id", type=int)
     matchday = request.args.get("matchday", type=int)
     if request.method == "GET":
-        if not player_id or not matchday:
+        if not player_id or matchday not in MATCHDAYS:
             flash("Pick a player and gameweek first.", "warning")
             return redirect(url_for("index"))
-        # ensure matches loaded for that matchday
-        upsert_matches_from_api(matchday)
         matches = Match.query.filter_by(matchday=matchday).order_by(Match.utc_date).all()
-        player = Player.query.get(player_id)
-        # load existing predictions
-        existing = {p.match_id: p for p in Prediction.query.filter_by(player_id=player_id).all()}
-        return render_template("make_prediction.html", matches=matches, player=player, existing=existing, now_utc=datetime.now(timezone.utc))
+        if not matches:
+            enqueue_matchday_refresh(matchday)
+            flash(f"Fixtures for GW {matchday} are being loaded, refresh in a moment.", "warning")
+        player = db.session.get(Player, player_id)
+        # load existing predictions for this matchday only
+        existing = {p.match_id: p for p in Prediction.query.filter(
+            Prediction.player_id == player_id,
+            Prediction.match_id.in_([m.id for m in matches])
+        ).all()}
+        cutoff = picks_close_before()
+        open_ids = {m.id for m in matches if m.utc_date > cutoff}
+        return render_template("make_prediction.html", matches=matches, player=player, existing=existing, open_ids=open_ids)
     else:
         # POST: submit picks
         player_id = int(request.form["player_id"])
         matchday = int(request.form["matchday"])
-        player = Player.query.get(player_id)
-        # For each match in this matchday, read pick if provided
-        matches = Match.query.filter_by(matchday=matchday).all()
-        messages = []
-        for match in matches:
-            # check if allowed: now < kickoff - 5 minutes
-            kickoff = match.utc_date.replace(tzinfo=timezone.utc)
-            cutoff = kickoff - timedelta(minutes=5)
-            now = datetime.now(timezone.utc)
-            if now >= cutoff:
-                # not allowed to change any picks for this match
-                continue
-            pick_key = f"pick_{match.id}"
-            pick = request.form.get(pick_key)
-            if not pick:
-                # Skip empty
-                continue
-            pick_val = pick.upper()
-            # store or update
-            existing = Prediction.query.filter_by(player_id=player_id, match_id=match.id).first()
-            if existing:
-                existing.pick = pick_val
-                existing.created_at = datetime.utcnow()
-            else:
-                p = Prediction(player_id=player_id, match_id=match.id, pick=pick_val)
-                db.session.add(p)
-        db.session.commit()
+        # Collect submitted picks: pick_<match_id> -> HOME/DRAW/AWAY
+        picks = {}
+        for key, value in request.form.items():
+            if key.startswith("pick_") and key[5:].isdigit() and value and value.upper() in PICKS:
+                picks[int(key[5:])] = value.upper()
+        # only matches still open for picks (kickoff more than 5 minutes away)
+        open_matches = Match.query.with_entities(Match.id).filter(
+            Match.matchday == matchday,
+            Match.id.in_(picks.keys()),
+            Match.utc_date > picks_close_before()
+        ).all()
+        rows = [{"player_id": player_id, "match_id": match_id, "pick": picks[match_id]} for (match_id,) in open_matches]
+        if rows:
+            # store or update all picks in one statement
+            stmt = pg_insert(Prediction.__table__).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['player_id','match_id'],
+                set_={'pick': stmt.excluded.pick, 'created_at': stmt.excluded.created_at,
+                      'updated_at': stmt.excluded.updated_at}
+            )
+            db.session.execute(stmt)
+            db.session.commit()
         flash("Predictions saved (for matches that are at least 5 minutes from kickoff).", "success")
         return redirect(url_for("confirm", player_id=player_id, matchday=matchday))
 
@@ -183,55 +436,64 @@ def make_prediction():
 def confirm():
     player_id = request.args.get("player_id", type=int)
     matchday = request.args.get("matchday", type=int)
-    player = Player.query.get(player_id)
+    player = db.session.get(Player, player_id)
     matches = Match.query.filter_by(matchday=matchday).order_by(Match.utc_date).all()
-    preds = {p.match_id: p for p in Prediction.query.filter_by(player_id=player_id).all()}
+    preds = {p.match_id: p for p in Prediction.query.filter(
+        Prediction.player_id == player_id,
+        Prediction.match_id.in_([m.id for m in matches])
+    ).all()}
     return render_template("confirm.html", player=player, matchday=matchday, matches=matches, preds=preds, now_utc=datetime.now(timezone.utc))
 
 @app.route("/weekly_results/<int:matchday>")
 def weekly_results(matchday):
     # show table of results for each player for the matchday
-    # ensure matches loaded
-    upsert_matches_from_api(matchday)
-    matches = Match.query.filter_by(matchday=matchday).order_by(Match.utc_date).all()
-    players = Player.query.order_by(Player.id).all()
-    # Build data: player -> list of (match, pick, points)
-    table = []
-    for player in players:
-        row = {"player": player.name, "per_match": [], "sum":0}
-        for match in matches:
-            pred = Prediction.query.filter_by(player_id=player.id, match_id=match.id).first()
-            pick = pred.pick if pred else None
-            pts = points_for_prediction(pred.pick, match) if pred else 0
-            row["per_match"].append({
-                "match": match,
-                "pick": pick,
-                "points": pts
-            })
-            row["sum"] += pts
-        table.append(row)
-    return render_template("weekly_results.html", matchday=matchday, matches=matches, table=table)
+    if matchday not in MATCHDAYS:
+        abort(404)
+    # the page only changes when a match or prediction of this matchday does
+    match_count, last_match, last_pred = db.session.query(
+        func.count(distinct(Match.id)), func.max(Match.updated_at), func.max(Prediction.updated_at)) \
+        .select_from(Match) \
+        .outerjoin(Prediction, Prediction.match_id == Match.id) \
+        .filter(Match.matchday == matchday) \
+        .one()
+    # every player gets a row, so renames and newly seeded players change the page too
+    players_sig = db.session.execute(text(
+        "SELECT md5(string_agg(id || ':' || name, ',' ORDER BY id)) FROM players"
+    )).scalar()
+    tag = etag_for("weekly", matchday, last_match, last_pred, players_sig)
+
+    def render():
+        matches = Match.query.filter_by(matchday=matchday).order_by(Match.utc_date, Match.id).all()
+        match_by_id = {m.id: m for m in matches}
+        # one row per (player, match) with the pick and its points scored in SQL; limited to
+        # the matches loaded above so a fixture inserted in between can't miss match_by_id
+        rows = db.session.execute(text(WEEKLY_RESULTS_SQL), {"match_ids": list(match_by_id)}).all()
+        # Build data: player -> list of (match, pick, points)
+        table = []
+        for (_, name), cells in groupby(rows, key=lambda r: (r.player_id, r.name)):
+            per_match = [{"match": match_by_id[c.match_id], "pick": c.pick, "points": c.points} for c in cells]
+            table.append({"player": name, "per_match": per_match, "sum": sum(pm["points"] for pm in per_match)})
+        return render_template("weekly_results.html", matchday=matchday, matches=matches, table=table)
+
+    if not match_count:
+        # nothing stored for this matchday yet; send no ETag so the notice isn't swallowed by a 304
+        enqueue_matchday_refresh(matchday)
+        flash(f"Fixtures for GW {matchday} are being loaded, refresh in a moment.", "warning")
+        return render()
+    return conditional_page(tag, render)
 
 @app.route("/totals")
 def totals():
-    # compute total points over all 38 matchdays
-    # ensure we have matches loaded for the played matchdays (fetching matchdays on demand)
-    players = Player.query.order_by(Player.id).all()
-    # get all matches that have scores or status finished
-    matches = Match.query.filter(Match.matchday >= 1).all()
-    # We'll compute by checking predictions and match results
-    player_totals = []
-    for player in players:
-        total = 0
-        # get player's predictions
-        preds = Prediction.query.filter_by(player_id=player.id).all()
-        for p in preds:
-            match = Match.query.get(p.match_id)
-            total += points_for_prediction(p.pick, match)
-        player_totals.append({"player":player.name, "total": total})
-    # Sort descending
-    player_totals.sort(key=lambda x: x['total'], reverse=True)
-    return render_template("totals.html", totals=player_totals)
+    # season standings are precomputed in mv_player_totals (see refresh_player_totals);
+    # the tag is built from the rows themselves so it can never run ahead of a view refresh
+    rows = db.session.execute(text("SELECT name, total FROM mv_player_totals ORDER BY total DESC, player_id")).all()
+    tag = etag_for("totals", *rows)
+
+    def render():
+        player_totals = [{"player": name, "total": total} for name, total in rows]
+        return render_template("totals.html", totals=player_totals)
+
+    return conditional_page(tag, render)
 
 # Admin route for manually entering results for GW1-3
 @app.route("/admin/manual_results", methods=["GET","POST"])
@@ -242,18 +504,21 @@ def admin_manual_results():
         return render_template("admin_manual_results.html", matches=matches)
     else:
         # Accept posted scores for multiple matches
+        parsed = {}
         for key, value in request.form.items():
             if key.startswith("home_"):
                 match_id = int(key.split("_",1)[1])
-                home_score = int(value)
-                away_score = int(request.form.get(f"away_{match_id}", 0))
-                match = Match.query.get(match_id)
-                if match:
-                    match.home_score = home_score
-                    match.away_score = away_score
-                    match.status = "FINISHED"
-                    db.session.add(match)
+                parsed[match_id] = (int(value), int(request.form.get(f"away_{match_id}", 0)))
+        known_ids = {match_id for (match_id,) in db.session.query(Match.id).filter(Match.id.in_(parsed.keys())).all()}
+        now = datetime.utcnow()
+        updates = [
+            {"id": mid, "home_score": h, "away_score": a, "status": "FINISHED", "updated_at": now}
+            for mid, (h, a) in parsed.items() if mid in known_ids
+        ]
+        # one executemany UPDATE by primary key, no ORM objects loaded
+        db.session.bulk_update_mappings(Match, updates)
         db.session.commit()
+        refresh_player_totals()
         flash("Manual results updated for GW1-3.", "success")
         return redirect(url_for("admin_manual_results"))
 
@@ -1,8 +1,22 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Computed
 from datetime import datetime
 
 db = SQLAlchemy()
 
+PICKS = ('HOME', 'AWAY', 'DRAW')
+# every status Football-Data v4 reports for a match
+MATCH_STATUSES = ('SCHEDULED', 'TIMED', 'IN_PLAY', 'PAUSED', 'EXTRA_TIME', 'PENALTY_SHOOTOUT',
+                  'FINISHED', 'SUSPENDED', 'POSTPONED', 'CANCELLED', 'AWARDED', 'LIVE')
+
+# 'HOME','AWAY','DRAW' once both scores are known, else NULL
+MATCH_RESULT_SQL = (
+    "CASE WHEN home_score IS NULL OR away_score IS NULL THEN NULL "
+    "WHEN home_score > away_score THEN 'HOME' "
+    "WHEN away_score > home_score THEN 'AWAY' "
+    "ELSE 'DRAW' END"
+)
+
 class Player(db.Model):
     __tablename__ = "players"
     id = db.Column(db.Integer, primary_key=True)
@@ -18,9 +32,13 @@ class Match(db.Model):
     utc_date = db.Column(db.DateTime, nullable=False)
     home_team = db.Column(db.String(120), nullable=False)
     away_team = db.Column(db.String(120), nullable=False)
-    status = db.Column(db.String(20), nullable=False)  # SCHEDULED, FINISHED, etc.
+    status = db.Column(db.Enum(*MATCH_STATUSES, name='match_status_enum'), nullable=False)
     home_score = db.Column(db.Integer, nullable=True)
     away_score = db.Column(db.Integer, nullable=True)
+    result = db.Column(db.String(4), Computed(MATCH_RESULT_SQL, persisted=True))  # stored, computed by Postgres
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # matchday pages filter by matchday and order by kickoff
+    __table_args__ = (db.Index('ix_matches_matchday_date', 'matchday', 'utc_date'),)
 
 class Prediction(db.Model):
     __tablename__ = "predictions"
@@ -28,9 +46,16 @@ class Prediction(db.Model):
     player_id = db.Column(db.Integer, db.ForeignKey('players.id'), nullable=False)
     match_id = db.Column(db.Integer, db.ForeignKey('matches.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    pick = db.Column(db.String(10), nullable=False)  # 'HOME','AWAY','DRAW'
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    pick = db.Column(db.Enum(*PICKS, name='pick_enum'), nullable=False)
+    # handlers load matches explicitly; use selectinload() if a view needs prediction.match
+    match = db.relationship('Match', lazy='raise')
     # unique per player & match:
-    __table_args__ = (db.UniqueConstraint('player_id','match_id', name='uix_player_match'),)
+    __table_args__ = (
+        db.UniqueConstraint('player_id','match_id', name='uix_player_match'),
+        # match_id IN (...) lookups can't use the (player_id, match_id) unique index
+        db.Index('ix_predictions_match_id', 'match_id'),
+    )
 
 class ManualResult(db.Model):
     """